@@ -7,6 +7,8 @@ import json
 from pathlib import Path
 import aiohttp
 import asyncio
+import os
+import threading
 
 # Configure page settings
 st.set_page_config(
@@ -16,77 +18,89 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for better styling
-st.markdown("""
+@st.cache_resource
+def inject_css():
+    """Custom CSS for better styling; static, so the element is built once and replayed."""
+    st.markdown("""
 <style>
     .stApp {
         max-width: 1200px;
         margin: 0 auto;
     }
-    .output-container {
-        background-color: #f0f2f6;
-        border-radius: 5px;
-        padding: 20px;
-        margin: 10px 0;
-    }
-    .error-message {
-        color: #ff4b4b;
-        padding: 10px;
-        border-left: 3px solid #ff4b4b;
-        background-color: #ffd7d7;
-        margin: 5px 0;
-    }
-    .suggestion-message {
-        color: #0068c9;
-        padding: 10px;
-        border-left: 3px solid #0068c9;
-        background-color: #f0f7ff;
-        margin: 5px 0;
-    }
-    .performance-tip {
-        color: #09ab3b;
-        padding: 10px;
-        border-left: 3px solid #09ab3b;
-        background-color: #e6f9ed;
-        margin: 5px 0;
-    }
-    .chat-message {
-        padding: 15px;
-        border-radius: 10px;
-        margin: 10px 0;
-        box-shadow: 0 1px 2px rgba(0,0,0,0.1);
-    }
-    .user-message {
-        background-color: #1a67d2;
-        color: white;
-        margin-left: 20%;
-    }
-    .assistant-message {
-        background-color: #f0f2f6;
-        color: #0e1117;
-        margin-right: 20%;
-        border: 1px solid #dfe1e6;
-    }
-    .chat-message strong {
-        color: inherit;
-        opacity: 0.9;
-    }
 </style>
 """, unsafe_allow_html=True)
 
+inject_css()
+
+@st.cache_resource
+def get_session():
+    """Shared HTTP session so connections to the backend are kept alive across reruns."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    session.mount("http://", adapter)
+    return session
+
+def get_code_context_id(code):
+    """Register code with the backend once and return the id chat requests refer to."""
+    if st.session_state.get("code_context") != code:
+        response = get_session().post("http://localhost:8000/context", json={"code": code})
+        response.raise_for_status()
+        st.session_state.code_context_id = response.json()["id"]
+        st.session_state.code_context = code
+    return st.session_state.code_context_id
+
+def post_chat(payload):
+    return get_session().post(
+        "http://localhost:8000/chat",
+        json=payload,
+        stream=True
+    )
+
+# INPROC=1 runs the backend inside the Streamlit process instead of calling it over HTTP
+INPROC = bool(os.getenv("INPROC"))
+
+if INPROC:
+    from backend.api import run_analysis
+    from backend.code_analyzer import CodeAnalyzer
+    from backend.ai_service import AIService
+
+    @st.cache_resource
+    def get_backend():
+        """Backend services plus the event loop they run on, shared across reruns."""
+        # The OpenAI client is bound to one loop, so keep a single loop alive in a thread
+        loop = asyncio.new_event_loop()
+        threading.Thread(target=loop.run_forever, daemon=True).start()
+        return CodeAnalyzer(), AIService(), loop
+
+    def run_in_backend(coro):
+        return asyncio.run_coroutine_threadsafe(coro, get_backend()[2]).result()
+
+    def iter_in_backend(agen):
+        """Drive an async generator on the backend loop as a plain iterator."""
+        while True:
+            try:
+                yield run_in_backend(agen.__anext__())
+            except StopAsyncIteration:
+                return
+
 # Initialize session state
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
 
-# Title and description
-st.title("🔍 AI Code Debugger")
-st.markdown("""
+@st.cache_resource
+def render_header():
+    """Static title and description, built once and replayed on reruns."""
+    st.title("🔍 AI Code Debugger")
+    st.markdown("""
 This tool helps you debug Python code using AI-powered analysis. It can:
 - Detect syntax and logical errors
 - Suggest performance improvements
 - Provide interactive debugging assistance
 """)
 
+# Title and description
+render_header()
+
 # Sidebar with options
 with st.sidebar:
     st.header("⚙️ Settings")
@@ -113,36 +127,50 @@ with col1:
     # Code input options
     input_method = st.radio("Input Method", ["Paste Code", "Upload File"])
     
-    if input_method == "Paste Code":
-        code = st.text_area("Enter your Python code here:", height=300)
-    else:
-        uploaded_file = st.file_uploader("Upload a Python file", type=["py"])
-        if uploaded_file:
-            code = uploaded_file.getvalue().decode("utf-8")
-            st.code(code, language="python")
-
-    if st.button("🔍 Analyze Code", type="primary"):
+    # Inputs live in a form so typing doesn't rerun the script until submit
+    with st.form("analyze_form"):
+        if input_method == "Paste Code":
+            code = st.text_area("Enter your Python code here:", height=300)
+        else:
+            uploaded_file = st.file_uploader("Upload a Python file", type=["py"])
+            if uploaded_file:
+                code = uploaded_file.getvalue().decode("utf-8")
+                st.code(code, language="python")
+
+        submitted = st.form_submit_button("🔍 Analyze Code", type="primary")
+
+    if submitted:
         if 'code' in locals() and code.strip():
             with st.spinner("Analyzing code..."):
-                # Make API request to backend
                 try:
-                    response = requests.post(
-                        "http://localhost:8000/analyze",
-                        json={"code": code}
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        
+                    if INPROC:
+                        code_analyzer, ai_service, _ = get_backend()
+                        result = run_in_backend(
+                            run_analysis(code_analyzer, ai_service, code)
+                        ).model_dump()
+                    else:
+                        # Make API request to backend
+                        response = get_session().post(
+                            "http://localhost:8000/analyze",
+                            json={"code": code, "analysis_mode": analysis_mode}
+                        )
+                        if response.status_code == 200:
+                            result = response.json()
+                        else:
+                            result = None
+                            st.error(f"Error: {response.text}")
+
+                    if result is not None:
                         # Store results in session state
                         st.session_state.analysis_result = result
                         
                         # Show success message
                         st.success("Analysis complete! Check the results panel.")
-                    else:
-                        st.error(f"Error: {response.text}")
-                except Exception as e:
+                except requests.RequestException as e:
                     st.error(f"Failed to connect to the backend server: {str(e)}")
+                except Exception as e:
+                    # In-process failures (missing API key, pylint, OpenAI) have no server to blame
+                    st.error(f"Analysis failed: {str(e)}")
         else:
             st.warning("Please enter or upload some code first.")
 
@@ -156,11 +184,7 @@ with col2:
         if result["errors"]:
             st.markdown("### ❌ Errors Found")
             for error in result["errors"]:
-                with st.expander(f"Line {error['line']}: {error['type']}"):
-                    st.markdown(f"""
-                    **Message:** {error['message']}  
-                    **Severity:** {error['severity']}
-                    """)
+                st.error(f"**Line {error['line']}:** {error['message']} ({error['type']}, {error['severity']})")
         else:
             st.markdown("### ✅ No Errors Found")
         
@@ -169,65 +193,75 @@ with col2:
             st.markdown("### 💡 Suggestions")
             for suggestion in result["suggestions"]:
                 with st.expander(f"Suggestion for line {suggestion['line']}"):
-                    st.markdown(suggestion["suggestion"])
+                    st.info(suggestion["suggestion"])
         
         # Display performance tips
         if result["performance_tips"]:
             st.markdown("### ⚡ Performance Tips")
             for tip in result["performance_tips"]:
-                with st.expander(f"Optimization for line {tip['line']}"):
-                    st.markdown(f"""
-                    **Issue:** {tip['message']}  
-                    **Suggestion:** {tip['suggestion']}
-                    """)
+                st.success(f"**Line {tip['line']}:** {tip['message']}\n\n{tip['suggestion']}")
 
 # Chat interface
 st.markdown("---")
 st.subheader("💬 Debugging Assistant")
 
-# Chat input
-user_message = st.text_input("Ask a question about your code:")
-if st.button("Send", key="chat_send"):
-    if user_message:
-        # Add user message to chat history
-        st.session_state.chat_history.append({"role": "user", "content": user_message})
-        
+chat_container = st.container()
+
+# Display chat history
+with chat_container:
+    for message in st.session_state.chat_history:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+
+# Chat input (only triggers a rerun on submit)
+user_message = st.chat_input("Ask a question about your code...")
+if user_message:
+    # Add user message to chat history
+    st.session_state.chat_history.append({"role": "user", "content": user_message})
+
+    with chat_container:
+        with st.chat_message("user"):
+            st.markdown(user_message)
+
         # Get code context
         code_context = code if 'code' in locals() else ""
-        
-        # Make API request to chat endpoint
+
         try:
-            response = requests.post(
-                "http://localhost:8000/chat",
-                json={
-                    "message": user_message,
-                    "code_context": code_context
-                }
-            )
-            
-            if response.status_code == 200:
-                assistant_response = response.json()["response"]
+            if INPROC:
+                _, ai_service, _ = get_backend()
+                with st.chat_message("assistant"):
+                    assistant_response = st.write_stream(
+                        iter_in_backend(ai_service.get_chat_response(user_message, code_context))
+                    )
                 st.session_state.chat_history.append({"role": "assistant", "content": assistant_response})
             else:
-                st.error(f"Error: {response.text}")
+                # Make API request to chat endpoint
+                payload = {
+                    "message": user_message,
+                    "code_context_id": get_code_context_id(code_context)
+                }
+                response = post_chat(payload)
+
+                if response.status_code == 404:
+                    # This backend worker doesn't know the id (restart, eviction, or another
+                    # worker registered it), so send the code inline and register again next time
+                    response.close()
+                    st.session_state.pop("code_context", None)
+                    payload["code_context"] = code_context
+                    response = post_chat(payload)
+
+                if response.status_code == 200:
+                    # Render tokens as they arrive
+                    with st.chat_message("assistant"):
+                        assistant_response = st.write_stream(
+                            response.iter_content(chunk_size=None, decode_unicode=True)
+                        )
+                    st.session_state.chat_history.append({"role": "assistant", "content": assistant_response})
+                else:
+                    st.error(f"Error: {response.text}")
         except Exception as e:
             st.error(f"Failed to get response: {str(e)}")
 
-# Display chat history
-for message in st.session_state.chat_history:
-    if message["role"] == "user":
-        st.markdown(f"""
-        <div class="chat-message user-message">
-            <strong>You:</strong><br>{message["content"]}
-        </div>
-        """, unsafe_allow_html=True)
-    else:
-        st.markdown(f"""
-        <div class="chat-message assistant-message">
-            <strong>Assistant:</strong><br>{message["content"]}
-        </div>
-        """, unsafe_allow_html=True)
-
 if __name__ == "__main__":
     st.markdown("---")
     st.markdown("Made with ❤️ by AI Code Debugger") 
\ No newline at end of file
@@ -1,6 +1,8 @@
 import os
-from typing import List, Dict
-from openai import OpenAI
+import asyncio
+import json
+from typing import AsyncIterator, List, Dict
+from openai import AsyncOpenAI
 from dotenv import load_dotenv
 import logging
 
@@ -23,20 +25,18 @@ class AIService:
                 "3. Replace 'your_api_key_here' with your actual OpenAI API key"
             )
         
-        try:
-            self.client = OpenAI(api_key=api_key)
-            # Test the API connection
-            self.client.models.list()
-            logger.info("Successfully initialized OpenAI API")
-            
-            # Set the default model
-            self.model = "gpt-3.5-turbo"
-            logger.info(f"Using model: {self.model}")
-        except Exception as e:
-            logger.error(f"Failed to initialize OpenAI API: {str(e)}")
-            raise ValueError(
-                f"Failed to initialize OpenAI API. Please check if your API key is valid: {str(e)}"
-            )
+        # The async client lets awaited completions run without blocking the event loop.
+        # The key itself is only checked by OpenAI on the first request.
+        self.client = AsyncOpenAI(api_key=api_key)
+
+        # Set the default model
+        self.model = "gpt-3.5-turbo"
+        logger.info(f"Using model: {self.model}")
+
+        # Cap concurrent suggestion requests to stay within OpenAI rate limits
+        self._suggestion_semaphore = asyncio.Semaphore(8)
+        # Errors answered per completion call when batching suggestions
+        self.suggestion_batch_size = 5
 
         self.error_prompt_template = """
         Analyze this Python code error and provide a detailed explanation and solution:
@@ -53,6 +53,24 @@ class AIService:
         3. Best practices to avoid this issue in the future
         """
 
+        self.batch_error_prompt_template = """
+        Analyze these Python code errors and provide a detailed explanation and solution for each:
+        
+        Code Context:
+        {code}
+        
+        Errors:
+        {errors}
+        
+        For each error, please provide:
+        1. A clear explanation of what's causing the error
+        2. A specific solution to fix it
+        3. Best practices to avoid this issue in the future
+        
+        Respond with a JSON object of the form {{"suggestions": ["...", ...]}},
+        where element i of the list answers error i.
+        """
+
         self.performance_prompt_template = """
         Analyze this Python code for performance optimization:
         
@@ -68,15 +86,29 @@ class AIService:
         """
 
     async def get_suggestions(self, code: str, errors: List[Dict]) -> List[Dict]:
-        suggestions = []
-        
-        for error in errors:
-            prompt = self.error_prompt_template.format(
-                code=code,
-                error=f"{error['type']}: {error['message']} at line {error['line']}"
+        # Pack errors into batches and request them concurrently; results keep the order of errors
+        batches = [
+            errors[i:i + self.suggestion_batch_size]
+            for i in range(0, len(errors), self.suggestion_batch_size)
+        ]
+        results = await asyncio.gather(
+            *(self._suggest_batch(code, batch) for batch in batches)
+        )
+        return [suggestion for batch in results for suggestion in batch]
+
+    async def _suggest_batch(self, code: str, errors: List[Dict]) -> List[Dict]:
+        if len(errors) == 1:
+            return [await self._suggest_one(code, errors[0])]
+
+        prompt = self.batch_error_prompt_template.format(
+            code=code,
+            errors="\n".join(
+                f"{i + 1}. {self._describe_error(error)}" for i, error in enumerate(errors)
             )
-            
-            try:
+        )
+
+        try:
+            async with self._suggestion_semaphore:
                 response = await self.client.chat.completions.create(
                     model=self.model,
                     messages=[
@@ -84,26 +116,68 @@ class AIService:
                         {"role": "user", "content": prompt}
                     ],
                     temperature=0.7,
-                    max_tokens=500
+                    max_tokens=500 * len(errors),
+                    response_format={"type": "json_object"}
                 )
-                
-                suggestion = response.choices[0].message.content
-                suggestions.append({
-                    "error_type": error["type"],
-                    "line": error["line"],
-                    "suggestion": suggestion
-                })
-            except Exception as e:
-                logger.error(f"Failed to get suggestion: {str(e)}")
-                suggestions.append({
+
+            suggestions = json.loads(response.choices[0].message.content)["suggestions"]
+            if len(suggestions) != len(errors):
+                raise ValueError(f"expected {len(errors)} suggestions, got {len(suggestions)}")
+
+            return [
+                {
                     "error_type": error["type"],
                     "line": error["line"],
-                    "suggestion": f"Failed to get AI suggestion: {str(e)}"
-                })
-                
-        return suggestions
+                    "suggestion": str(suggestion),
+                    "success": True
+                }
+                for error, suggestion in zip(errors, suggestions)
+            ]
+        except Exception as e:
+            # Fall back to one request per error
+            logger.warning(f"Batched suggestion failed, retrying per error: {str(e)}")
+            return await asyncio.gather(
+                *(self._suggest_one(code, error) for error in errors)
+            )
+
+    @staticmethod
+    def _describe_error(error: Dict) -> str:
+        return f"{error['type']}: {error['message']} at line {error['line']}"
+
+    async def _suggest_one(self, code: str, error: Dict) -> Dict:
+        prompt = self.error_prompt_template.format(
+            code=code,
+            error=self._describe_error(error)
+        )
+
+        try:
+            async with self._suggestion_semaphore:
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": "You are an expert Python developer helping to debug code."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.7,
+                    max_tokens=500
+                )
+
+            return {
+                "error_type": error["type"],
+                "line": error["line"],
+                "suggestion": response.choices[0].message.content,
+                "success": True
+            }
+        except Exception as e:
+            logger.error(f"Failed to get suggestion: {str(e)}")
+            return {
+                "error_type": error["type"],
+                "line": error["line"],
+                "suggestion": f"Failed to get AI suggestion: {str(e)}",
+                "success": False
+            }
 
-    async def get_chat_response(self, message: str, code_context: str) -> str:
+    async def get_chat_response(self, message: str, code_context: str) -> AsyncIterator[str]:
         try:
             prompt = f"""
             User Question: {message}
@@ -124,13 +198,18 @@ class AIService:
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.7,
-                max_tokens=1000
+                max_tokens=1000,
+                stream=True
             )
-            
-            return response.choices[0].message.content
+
+            # Yield tokens as they arrive so the client can render them immediately
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
         except Exception as e:
+            # Re-raise so callers can tell a failure apart from a real reply
             logger.error(f"Failed to get chat response: {str(e)}")
-            return f"Failed to get AI response: {str(e)}"
+            raise
 
     async def optimize_code(self, code: str, performance_issues: List[Dict]) -> Dict:
         try:
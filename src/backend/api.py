@@ -1,15 +1,25 @@
 import os
+import asyncio
+import subprocess
+import sys
+import logging
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List, Dict
-import ast
-import pylint.lint
-import autopep8
+from typing import AsyncIterator, Optional, List, Dict
+import hashlib
+from cachetools import LRUCache
 from .code_analyzer import CodeAnalyzer
 from .ai_service import AIService
 
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
 # Load environment variables
 load_dotenv()
 
@@ -17,7 +27,22 @@ load_dotenv()
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", "8000"))
 
-app = FastAPI(title="AI Code Debugger API")
+# Services are created once in the app lifespan rather than at import time
+code_analyzer: Optional[CodeAnalyzer] = None
+ai_service: Optional[AIService] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global code_analyzer, ai_service
+    code_analyzer = CodeAnalyzer()
+    ai_service = AIService()
+    yield
+
+app = FastAPI(
+    title="AI Code Debugger API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
 # Configure CORS
 app.add_middleware(
@@ -28,13 +53,58 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-code_analyzer = CodeAnalyzer()
-ai_service = AIService()
+class JSONGZipMiddleware(GZipMiddleware):
+    """GZip that leaves streamed routes alone, since it buffers chunks until the body ends."""
+
+    streaming_paths = {"/chat"}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.streaming_paths:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Compress larger responses such as formatted code and AI suggestions
+app.add_middleware(JSONGZipMiddleware, minimum_size=1024)
+
+# Responses keyed on a hash of every input that shapes them
+analysis_cache = LRUCache(maxsize=256)
+chat_cache = LRUCache(maxsize=256)
+# Code registered via /context so chat requests can send just its id
+context_cache = LRUCache(maxsize=256)
+
+def _cache_key(*parts: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+# Seconds to wait for ruff before returning the code unformatted
+FORMAT_TIMEOUT = 10
+
+def format_code(code: str) -> str:
+    try:
+        # Run ruff through this interpreter so the venv's copy is used even when
+        # the venv isn't activated
+        result = subprocess.run(
+            [sys.executable, "-m", "ruff", "format", "-"],
+            input=code,
+            text=True,
+            capture_output=True,
+            check=True,
+            timeout=FORMAT_TIMEOUT
+        )
+        return result.stdout
+    except (OSError, subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        # Formatting is cosmetic, so fall back to the original code
+        logger.warning(f"Failed to format code: {str(e)}")
+        return code
 
 class CodeRequest(BaseModel):
     code: str
     filename: Optional[str] = None
+    analysis_mode: Optional[str] = None
 
 class DebugResponse(BaseModel):
     errors: List[Dict]
@@ -42,21 +112,47 @@ class DebugResponse(BaseModel):
     performance_tips: List[Dict]
     formatted_code: str
 
+async def run_analysis(code_analyzer: CodeAnalyzer, ai_service: AIService, code: str) -> DebugResponse:
+    # Run the CPU-bound stages in the executor so they overlap with the OpenAI calls
+    loop = asyncio.get_running_loop()
+    errors_task = loop.run_in_executor(None, code_analyzer.find_errors, code)
+    performance_task = loop.run_in_executor(None, code_analyzer.analyze_performance, code)
+    format_task = loop.run_in_executor(None, format_code, code)
+
+    # Only the suggestions depend on the errors
+    errors = await errors_task
+    suggestions, performance_tips, formatted_code = await asyncio.gather(
+        ai_service.get_suggestions(code, errors),
+        performance_task,
+        format_task
+    )
+
+    return DebugResponse(
+        errors=errors,
+        suggestions=suggestions,
+        performance_tips=performance_tips,
+        formatted_code=formatted_code
+    )
+
+def _is_cacheable(response: DebugResponse) -> bool:
+    # Failed OpenAI calls and pylint crashes are transient, so don't pin their fallback
+    # text in the cache. The performance AnalysisError only means the code doesn't
+    # parse, which is the same on every run.
+    if any(not suggestion.get("success", True) for suggestion in response.suggestions):
+        return False
+    return not any(error["type"] == "AnalysisError" for error in response.errors)
+
 @app.post("/analyze", response_model=DebugResponse)
 async def analyze_code(code_request: CodeRequest):
+    key = _cache_key(code_request.code, code_request.analysis_mode or "")
+    if key in analysis_cache:
+        return analysis_cache[key]
+
     try:
-        # Analyze code for errors and suggestions
-        errors = code_analyzer.find_errors(code_request.code)
-        suggestions = await ai_service.get_suggestions(code_request.code, errors)
-        performance_tips = code_analyzer.analyze_performance(code_request.code)
-        formatted_code = autopep8.fix_code(code_request.code)
-
-        return DebugResponse(
-            errors=errors,
-            suggestions=suggestions,
-            performance_tips=performance_tips,
-            formatted_code=formatted_code
-        )
+        response = await run_analysis(code_analyzer, ai_service, code_request.code)
+        if _is_cacheable(response):
+            analysis_cache[key] = response
+        return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -69,20 +165,61 @@ async def upload_file(file: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Chat replies are streamed as raw UTF-8 text chunks
+CHAT_MEDIA_TYPE = "text/plain; charset=utf-8"
+
+class ContextRequest(BaseModel):
+    code: str
+
+@app.post("/context")
+async def register_context(context_request: ContextRequest):
+    context_id = _cache_key(context_request.code)
+    context_cache[context_id] = context_request.code
+    return {"id": context_id}
+
 class ChatRequest(BaseModel):
     message: str
-    code_context: str
+    code_context: Optional[str] = None
+    code_context_id: Optional[str] = None
+
+async def _stream_chat(key: str, first_chunk: str, chunks: AsyncIterator[str]):
+    reply = [first_chunk]
+    yield first_chunk
+    try:
+        async for chunk in chunks:
+            reply.append(chunk)
+            yield chunk
+    except Exception as e:
+        # The status line is already sent, so flag the failure in the body and skip caching
+        yield f"\n\nFailed to get AI response: {str(e)}"
+        return
+    chat_cache[key] = "".join(reply)
 
 @app.post("/chat")
 async def chat_with_ai(chat_request: ChatRequest):
+    code_context = chat_request.code_context
+    if chat_request.code_context_id is not None:
+        code_context = context_cache.get(chat_request.code_context_id, code_context)
+        if code_context is None:
+            raise HTTPException(status_code=404, detail="Unknown code context id")
+
+    key = _cache_key(code_context or "", chat_request.message)
+    if key in chat_cache:
+        return StreamingResponse(iter([chat_cache[key]]), media_type=CHAT_MEDIA_TYPE)
+
+    # Wait for the first chunk so request failures still surface as an error status
+    chunks = ai_service.get_chat_response(chat_request.message, code_context or "")
     try:
-        response = await ai_service.get_chat_response(
-            chat_request.message,
-            chat_request.code_context
-        )
-        return {"response": response}
+        first_chunk = await chunks.__anext__()
+    except StopAsyncIteration:
+        first_chunk = ""
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=f"Failed to get AI response: {str(e)}")
+
+    return StreamingResponse(
+        _stream_chat(key, first_chunk, chunks),
+        media_type=CHAT_MEDIA_TYPE
+    )
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,19 +1,93 @@
 import ast
+import hashlib
 import astroid
-from pylint.lint import Run
+import diskcache
+import pylint
+from pylint.lint import PyLinter
 from pylint.reporters import JSONReporter
-from io import StringIO
-import sys
-import tokenize
 from typing import List, Dict
 import tempfile
 import os
+import threading
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Message categories turned off on the shared linter
+DISABLED_MESSAGES = ("I",)
+
+# Cached lint results are only valid for the pylint version and setup that produced them
+LINT_FINGERPRINT = f"pylint={pylint.__version__};disable={','.join(DISABLED_MESSAGES)}"
+
+PYLINT_CACHE_DIR = os.getenv(
+    "PYLINT_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pylint_cache")
+)
+
+# Write lint snippets to a RAM-backed directory where one is available
+TEMP_DIR = "/dev/shm" if os.access("/dev/shm", os.W_OK) else None
+
+class PerfVisitor(ast.NodeVisitor):
+    """Collects performance issues in a single pass, tracking loop nesting depth."""
+
+    def __init__(self):
+        self.issues: List[Dict] = []
+        self.depth = 0
+
+    def _visit_loop(self, node: ast.AST):
+        # Track nested loops
+        if self.depth > 0:
+            self.issues.append({
+                "type": "NestedLoop",
+                "line": node.lineno,
+                "message": "Nested loop detected",
+                "suggestion": "Consider using alternative approaches like list comprehension or vectorized operations."
+            })
+
+        self.depth += 1
+        self.generic_visit(node)
+        self.depth -= 1
+
+    visit_For = _visit_loop
+    visit_While = _visit_loop
+
+    def visit_Call(self, node: ast.Call):
+        # Check for list append inside a loop
+        if (self.depth > 0
+                and isinstance(node.func, ast.Attribute)
+                and node.func.attr == 'append'
+                and isinstance(node.func.value, ast.Name)):
+            self.issues.append({
+                "type": "IneffientListOperation",
+                "line": node.lineno,
+                "message": "List append in loop",
+                "suggestion": "Consider using list comprehension or pre-allocating the list."
+            })
+
+        self.generic_visit(node)
+
+class ComplexityVisitor(ast.NodeVisitor):
+    """Counts decision points and function definitions in a single pass."""
+
+    def __init__(self):
+        self.cyclomatic = 0
+        self.functions = 0
+
+    def _visit_decision(self, node: ast.AST):
+        self.cyclomatic += 1
+        self.generic_visit(node)
+
+    visit_If = _visit_decision
+    visit_While = _visit_decision
+    visit_For = _visit_decision
+    visit_ExceptHandler = _visit_decision
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        self.functions += 1
+        self.generic_visit(node)
+
 class CodeAnalyzer:
     def __init__(self):
         self.common_performance_patterns = {
@@ -31,44 +105,47 @@ class CodeAnalyzer:
             )
         }
 
+        # Build the linter once so plugins and checkers aren't reloaded per request
+        self._linter = PyLinter()
+        self._linter.load_default_plugins()
+        for message in DISABLED_MESSAGES:
+            self._linter.disable(message)
+        self._linter.set_reporter(JSONReporter())
+        # PyLinter keeps per-run state, so only one check may run at a time
+        self._linter_lock = threading.Lock()
+        # Lint results persist across restarts; unchanged code skips pylint entirely
+        self._cache = diskcache.Cache(PYLINT_CACHE_DIR)
+
     def find_errors(self, code: str) -> List[Dict]:
+        digest = hashlib.blake2b(LINT_FINGERPRINT.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(code.encode("utf-8"))
+        key = digest.hexdigest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
         errors = []
-        temp_file = None
-        
-        # Syntax error check
-        try:
-            ast.parse(code)
-        except SyntaxError as e:
-            return [{
-                "type": "SyntaxError",
-                "line": e.lineno,
-                "message": str(e),
-                "severity": "error"
-            }]
 
-        # Pylint analysis
+        # Pylint analysis (syntax errors are reported by pylint itself)
         try:
-            # Create temporary file with a unique name
-            temp_file = tempfile.NamedTemporaryFile(
-                mode='w',
-                suffix='.py',
-                delete=False,
-                encoding='utf-8'
-            )
-            temp_file.write(code)
-            temp_file.close()  # Close the file before Pylint reads it
-            
-            reporter = JSONReporter()
-            Run([temp_file.name], reporter=reporter, do_exit=False)
-            
-            for message in reporter.messages:
+            with self._linter_lock:
+                reporter = self._linter.reporter
+                reporter.messages.clear()
+                self._lint_source(code)
+                messages = list(reporter.messages)
+
+            for message in messages:
                 errors.append({
                     "type": message.symbol,
                     "line": message.line,
                     "message": message.msg,
                     "severity": message.category.lower()
                 })
-            
+
+            # Fatal messages mean pylint itself failed, so don't keep them around
+            if not any(error["severity"] == "fatal" for error in errors):
+                self._cache[key] = errors
         except Exception as e:
             logger.error(f"Error during code analysis: {str(e)}")
             errors.append({
@@ -77,22 +154,37 @@ class CodeAnalyzer:
                 "message": f"Failed to analyze code: {str(e)}",
                 "severity": "error"
             })
-            
-        finally:
-            # Clean up the temporary file
-            if temp_file:
-                try:
-                    os.unlink(temp_file.name)
-                except Exception as e:
-                    logger.warning(f"Failed to delete temporary file {temp_file.name}: {str(e)}")
 
         return errors
 
+    def _lint_source(self, code: str):
+        temp_file = tempfile.NamedTemporaryFile(
+            mode='w',
+            suffix='.py',
+            dir=TEMP_DIR,
+            delete=False,
+            encoding='utf-8'
+        )
+        try:
+            temp_file.write(code)
+            temp_file.close()  # Close the file before Pylint reads it
+            self._linter.check([temp_file.name])
+        finally:
+            # Drop the parsed snippet so astroid's module cache doesn't grow per request
+            modname = os.path.splitext(os.path.basename(temp_file.name))[0]
+            astroid.MANAGER.astroid_cache.pop(modname, None)
+            try:
+                os.unlink(temp_file.name)
+            except Exception as e:
+                logger.warning(f"Failed to delete temporary file {temp_file.name}: {str(e)}")
+
     def analyze_performance(self, code: str) -> List[Dict]:
         performance_issues = []
         try:
             tree = ast.parse(code)
-            self._analyze_node(tree, performance_issues)
+            visitor = PerfVisitor()
+            visitor.visit(tree)
+            performance_issues.extend(visitor.issues)
         except Exception as e:
             performance_issues.append({
                 "type": "AnalysisError",
@@ -102,58 +194,13 @@ class CodeAnalyzer:
             })
         return performance_issues
 
-    def _analyze_node(self, node: ast.AST, issues: List[Dict], depth: int = 0):
-        # Track nested loops
-        if isinstance(node, ast.For) or isinstance(node, ast.While):
-            if depth > 0:
-                issues.append({
-                    "type": "NestedLoop",
-                    "line": node.lineno,
-                    "message": "Nested loop detected",
-                    "suggestion": "Consider using alternative approaches like list comprehension or vectorized operations."
-                })
-
-        # Check for inefficient list operations
-        if isinstance(node, ast.Call):
-            if isinstance(node.func, ast.Attribute):
-                if node.func.attr == 'append' and isinstance(node.func.value, ast.Name):
-                    # Check if append is used in a loop
-                    if self._is_in_loop(node):
-                        issues.append({
-                            "type": "IneffientListOperation",
-                            "line": node.lineno,
-                            "message": "List append in loop",
-                            "suggestion": "Consider using list comprehension or pre-allocating the list."
-                        })
-
-        # Recursively analyze child nodes
-        for child in ast.iter_child_nodes(node):
-            if isinstance(child, (ast.For, ast.While)):
-                self._analyze_node(child, issues, depth + 1)
-            else:
-                self._analyze_node(child, issues, depth)
-
-    def _is_in_loop(self, node: ast.AST) -> bool:
-        parent = node
-        while hasattr(parent, 'parent'):
-            parent = parent.parent
-            if isinstance(parent, (ast.For, ast.While)):
-                return True
-        return False
-
     def get_code_complexity(self, code: str) -> Dict:
         tree = ast.parse(code)
-        complexity = {
-            "cyclomatic": 0,
-            "number_of_functions": 0,
+        visitor = ComplexityVisitor()
+        visitor.visit(tree)
+
+        return {
+            "cyclomatic": visitor.cyclomatic,
+            "number_of_functions": visitor.functions,
             "lines_of_code": len(code.splitlines())
         }
-        
-        # Count decision points for cyclomatic complexity
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.If, ast.While, ast.For, ast.ExceptHandler)):
-                complexity["cyclomatic"] += 1
-            elif isinstance(node, ast.FunctionDef):
-                complexity["number_of_functions"] += 1
-                
-        return complexity 
\ No newline at end of file
@@ -22,8 +22,11 @@ def main():
     # Get configuration from environment variables
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", "8000"))
+    # Auto-reload is for local development only and can't be combined with workers
+    reload = os.getenv("DEV") == "1"
+    workers = 1 if reload else int(os.getenv("WORKERS", os.cpu_count() or 1))
     
-    logger.info(f"Starting server on {host}:{port}")
+    logger.info(f"Starting server on {host}:{port} with {workers} worker(s)")
     logger.info("Environment variables loaded successfully")
     
     # Start the FastAPI application
@@ -31,7 +34,11 @@ def main():
         "src.backend.api:app",
         host=host,
         port=port,
-        reload=True,
+        reload=reload,
+        workers=workers,
+        # "auto" picks uvloop/httptools when installed (not on Windows or PyPy)
+        loop="auto",
+        http="auto",
         log_level="info"
     )
 